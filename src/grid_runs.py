@@ -0,0 +1,148 @@
+"""
+Animation: Grid of 3-body simulations with perturbed initial conditions
+
+Initial conditions are taken from:
+V. Szebehely and C. F. Peters (1967), "Complete solution of a general problem of three bodies",
+http://adsabs.harvard.edu/full/1967AJ.....72..876S
+"""
+
+import numpy as np
+from scipy.integrate import solve_ivp
+from matplotlib import pyplot as plt
+from matplotlib.animation import FuncAnimation
+from matplotlib.animation import FFMpegWriter
+from matplotlib.collections import EllipseCollection
+
+# --------------------------------------------------------------------------------------------------
+# Initialize the parameters
+# --------------------------------------------------------------------------------------------------
+
+tol = 1E-13                                         # ODE solver tolerance
+sim_time = 70                                       # Length of simulation (s)
+fps = 50                                            # Animation framerate
+G = 1.0                                             # Gravitational constant
+mass = [3, 4, 5]                                    # Mass of the bodies
+init_pos = np.array([1, 3, -2, -1, 1, -1])          # (x1, y1, x2, y2, x3, y3)
+init_vel = np.array([0, 0, 0, 0, 0, 0])             # (vx1, vy1, vx2, vy2, vx3, vy3)
+n_rows, n_cols = 7, 7                               # Number of tiles in the grid
+max_offset = 0.05                                   # Largest perturbation of the first body (m)
+
+# Each tile perturbs the initial position of the first body by a different (dx, dy) offset. The
+# tiles are filled row by row from the top left, so dx increases to the right and dy decreases
+# downwards, matching the orientation of the plot itself. With an odd number of rows and columns,
+# the unperturbed reference run is in the centre tile.
+offsets = []
+init_states = []
+for dy in max_offset * np.linspace(1, -1, n_rows):
+    for dx in max_offset * np.linspace(-1, 1, n_cols):
+        perturbed_pos = init_pos + np.array([dx, dy, 0, 0, 0, 0])
+        offsets.append((dx, dy))
+        init_states.append(np.concatenate((perturbed_pos, init_vel)))
+
+# --------------------------------------------------------------------------------------------------
+# Simulation
+#
+# Here we define the differential equations of our system and pass them along with each set of
+# initial conditions to the ODE solver.
+# --------------------------------------------------------------------------------------------------
+
+def accel(m1, m2, r0, r1, r2):
+    # Return the acceleration vector acting on a body resulting from the gravitational forces of the
+    # other two
+    r01 = r0 - r1
+    r02 = r0 - r2
+    r01_mag = np.linalg.norm(r01)
+    r02_mag = np.linalg.norm(r02)
+    return -G * (m1 * (r01 / r01_mag**3) + m2 * (r02 / r02_mag**3))
+
+def body_eqs(t, state):
+    # Return the system of 12 ODE's, where 'r' is the position vector and 'v' the velocity vector
+    r0, r1, r2 = np.reshape(state[:6], (3, 2))
+    r_dot = state[6:]
+    v_dot = np.zeros(6)
+    v_dot[0], v_dot[1] = accel(mass[1], mass[2], r0, r1, r2)
+    v_dot[2], v_dot[3] = accel(mass[0], mass[2], r1, r0, r2)
+    v_dot[4], v_dot[5] = accel(mass[0], mass[1], r2, r0, r1)
+    return np.concatenate((r_dot, v_dot))
+
+# Only evaluate the solution at the animation frame times. The solver still chooses its own internal
+# timestep, so this avoids storing (and then downsampling) millions of points for every run.
+n_frames = fps * sim_time
+t_frames = np.linspace(0, sim_time, n_frames, endpoint=False)
+
+# Solve the system of differential equations for each set of initial conditions and stack the
+# positions into a single array of shape (runs, frames, bodies, 2)
+pos = np.empty((len(init_states), n_frames, len(mass), 2))
+for k, (init_state, (dx, dy)) in enumerate(zip(init_states, offsets)):
+    sol = solve_ivp(fun=body_eqs,
+            t_span=(0, sim_time),
+            y0=init_state,
+            t_eval=t_frames,
+            rtol=tol,
+            atol=tol,
+            method='DOP853')
+    # The solver can stop early, e.g. during a near-collision, leaving fewer points than frames
+    if not sol.success:
+        raise RuntimeError("Solver failed for offset (dx, dy) = ({:+.4f}, {:+.4f}): {}".format(
+            dx, dy, sol.message))
+    pos[k] = np.reshape(sol.y[:6].T, (n_frames, len(mass), 2))
+
+# --------------------------------------------------------------------------------------------------
+# Animation
+#
+# Using the simulation data, we now make the animation
+# --------------------------------------------------------------------------------------------------
+
+# Initialize the plot with one tile per run, removing the axes and padding around the tiles
+fig, axs = plt.subplots(n_rows, n_cols)
+fig.set_size_inches(8, 8)
+fig.subplots_adjust(left=0, right=1, bottom=0, top=1, wspace=0.02, hspace=0.02)
+
+colors = ["#D81B60", "#1E88E5", "#FFC107"]
+
+# Each tile is much smaller than the 6 inch figure of the single run scripts, so scale up the
+# bodies to keep them visible
+body_scale = n_cols / 2
+diameters = [2 * body_scale * m / 30 for m in mass]
+
+# Create a single collection per tile holding a circle for each body. Updating one collection's
+# offsets is much cheaper than updating a separate patch for every body in every tile.
+bodies = []
+for ax, p, (dx, dy) in zip(axs.flat, pos, offsets):
+    ax.axis('scaled')
+    ax.axis([-5, 5, -5, 5])
+    ax.axis('off')
+    # Label each tile with its perturbation
+    ax.text(0.03, 0.97, 'dx={:+.3f}\ndy={:+.3f}'.format(dx, dy),
+        transform=ax.transAxes,
+        fontsize=5,
+        verticalalignment='top')
+    body = EllipseCollection(diameters,
+                diameters,
+                0,
+                units='xy',
+                offsets=p[0],
+                offset_transform=ax.transData,
+                facecolors=colors)
+    ax.add_collection(body)
+    bodies.append(body)
+
+# Animation function to update and return the collections at each frame
+def animate(i):
+    for body, p in zip(bodies, pos[:, i]):
+        body.set_offsets(p)
+    return bodies
+
+# Specify the animation parameters and call animate
+ani = FuncAnimation(fig,
+    animate,
+    frames=n_frames,            # Total number of frames in the animation
+    interval=1000/fps,          # Set the length of each frame (milliseconds)
+    blit=True,                  # Only update patches that have changed (more efficient)
+    repeat=False)               # Only play the animation once
+
+# Play the animation
+plt.show()
+
+# Uncomment to save the animation to a local file. All the tiles are encoded in a single pass.
+# ani.save('/path/to/save/animation.mp4', writer=FFMpegWriter(fps=fps))
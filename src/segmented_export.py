@@ -0,0 +1,219 @@
+"""
+Animation: 3-body simulation exported in resumable segments
+
+Initial conditions are taken from:
+V. Szebehely and C. F. Peters (1967), "Complete solution of a general problem of three bodies",
+http://adsabs.harvard.edu/full/1967AJ.....72..876S
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import numpy as np
+from scipy.integrate import solve_ivp
+from matplotlib import pyplot as plt
+from matplotlib import rcParams
+from matplotlib.animation import FuncAnimation
+from matplotlib.animation import FFMpegWriter
+from matplotlib.patches import Circle
+
+# --------------------------------------------------------------------------------------------------
+# Initialize the parameters
+# --------------------------------------------------------------------------------------------------
+
+tol = 1E-13                                         # ODE solver tolerance
+sim_time = 70                                       # Length of simulation (s)
+fps = 50                                            # Animation framerate
+segment_frames = 500                                # Number of frames in each video segment
+G = 1.0                                             # Gravitational constant
+mass = [3, 4, 5]                                    # Mass of the bodies
+init_pos = np.array([1, 3, -2, -1, 1, -1])          # (x1, y1, x2, y2, x3, y3)
+init_vel = np.array([0, 0, 0, 0, 0, 0])             # (vx1, vy1, vx2, vy2, vx3, vy3)
+init_state = np.concatenate((init_pos, init_vel))
+
+# The segments and manifest are saved to a 'segments' directory next to this script by default
+parser = argparse.ArgumentParser(description='Export the 3-body animation in resumable segments')
+parser.add_argument('--out-dir',
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'segments'),
+        help='directory for the video segments and the manifest')
+parser.add_argument('--out-file',
+        default=None,
+        help='final concatenated animation (default: OUT_DIR/animation.mp4)')
+args = parser.parse_args()
+out_dir = args.out_dir
+out_file = args.out_file or os.path.join(out_dir, 'animation.mp4')
+
+n_frames = fps * sim_time
+manifest_file = os.path.join(out_dir, 'manifest.json')
+trajectory_file = os.path.join(out_dir, 'trajectory.npy')
+
+# --------------------------------------------------------------------------------------------------
+# Simulation
+#
+# Here we define the differential equations of our system and pass them along with the initial
+# conditions to the ODE solver. The whole simulation is solved in a single call on the first run and
+# saved next to the manifest, so the export matches an uninterrupted animation exactly and a resumed
+# run never has to solve it again.
+# --------------------------------------------------------------------------------------------------
+
+def accel(m1, m2, r0, r1, r2):
+    # Return the acceleration vector acting on a body resulting from the gravitational forces of the
+    # other two
+    r01 = r0 - r1
+    r02 = r0 - r2
+    r01_mag = np.linalg.norm(r01)
+    r02_mag = np.linalg.norm(r02)
+    return -G * (m1 * (r01 / r01_mag**3) + m2 * (r02 / r02_mag**3))
+
+def body_eqs(t, state):
+    # Return the system of 12 ODE's, where 'r' is the position vector and 'v' the velocity vector
+    r0, r1, r2 = np.reshape(state[:6], (3, 2))
+    r_dot = state[6:]
+    v_dot = np.zeros(6)
+    v_dot[0], v_dot[1] = accel(mass[1], mass[2], r0, r1, r2)
+    v_dot[2], v_dot[3] = accel(mass[0], mass[2], r1, r0, r2)
+    v_dot[4], v_dot[5] = accel(mass[0], mass[1], r2, r0, r1)
+    return np.concatenate((r_dot, v_dot))
+
+def solve_trajectory():
+    # Solve the system over the whole simulation, evaluating the solution at each frame time, and
+    # return the positions with shape (frames, bodies, 2)
+    sol = solve_ivp(fun=body_eqs,
+            t_span=(0, sim_time),
+            y0=init_state,
+            t_eval=np.linspace(0, sim_time, n_frames, endpoint=False),
+            rtol=tol,
+            atol=tol,
+            method='DOP853')
+    # The solver can stop early, e.g. during a close encounter. Stop before anything is encoded or
+    # saved.
+    if not sol.success:
+        raise RuntimeError("Solver failed: {}".format(sol.message))
+    return np.reshape(sol.y[:6].T, (n_frames, len(mass), 2))
+
+def write_manifest(manifest):
+    # Write to a temporary file first and then rename it, so a crash can never leave a partially
+    # written manifest behind
+    tmp_file = manifest_file + '.tmp'
+    with open(tmp_file, 'w') as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(tmp_file, manifest_file)
+
+def write_trajectory(pos):
+    # Save the solved positions the same way as the manifest
+    tmp_file = os.path.join(out_dir, 'tmp_trajectory.npy')
+    np.save(tmp_file, pos)
+    os.replace(tmp_file, trajectory_file)
+
+# --------------------------------------------------------------------------------------------------
+# Animation
+#
+# Using the simulation data, we now make the animation one segment at a time
+# --------------------------------------------------------------------------------------------------
+
+# Initialize the plot
+fig, ax = plt.subplots()
+ax.axis('scaled')
+ax.axis([-5, 5, -5, 5])
+fig.set_size_inches(6, 6)
+
+colors = ["#D81B60", "#1E88E5", "#FFC107"]
+radii = [m/30 for m in mass]
+
+# Create a bodies list containing a circle patch for each body and add to axis
+bodies = []
+for p, r, c in zip(init_pos.reshape(3, 2), radii, colors):
+    body = Circle(p, radius=r, color=c)
+    ax.add_patch(body)
+    bodies.append(body)
+
+# Animation function to update and return the bodies at each frame of the current segment
+def animate(i):
+    for body, p in zip(bodies, pos[start + i]):
+        body.center = p
+    return bodies
+
+# Every parameter that affects the exported segments. If any of them change between runs, the
+# segments no longer belong to the same video and cannot be concatenated.
+settings = {'tol': tol,
+        'sim_time': sim_time,
+        'fps': fps,
+        'segment_frames': segment_frames,
+        'G': G,
+        'mass': mass,
+        'init_state': init_state.tolist(),
+        'size_inches': fig.get_size_inches().tolist(),
+        'dpi': fig.dpi,
+        'axis': list(ax.axis()),
+        'colors': colors,
+        'radii': radii,
+        'codec': rcParams['animation.codec'],
+        'bitrate': rcParams['animation.bitrate']}
+
+# Resume from the last completed segment if a manifest exists, otherwise start from the beginning
+os.makedirs(out_dir, exist_ok=True)
+if os.path.exists(manifest_file):
+    with open(manifest_file) as f:
+        manifest = json.load(f)
+    if manifest.get('settings') != settings:
+        raise RuntimeError("The settings in {} do not match this script. Remove the directory or "
+                "choose another --out-dir to start a new export.".format(manifest_file))
+else:
+    manifest = {'settings': settings, 'frame': 0, 'segments': []}
+    write_manifest(manifest)
+
+# Load the solved trajectory if a previous run already saved it
+if os.path.exists(trajectory_file):
+    pos = np.load(trajectory_file)
+else:
+    pos = solve_trajectory()
+    write_trajectory(pos)
+
+while manifest['frame'] < n_frames:
+    start = manifest['frame']
+    end = min(start + segment_frames, n_frames)
+
+    # Specify the animation parameters for this segment and call animate
+    ani = FuncAnimation(fig,
+        animate,
+        frames=end - start,         # Number of frames in this segment
+        interval=1000/fps,          # Set the length of each frame (milliseconds)
+        blit=True,                  # Only update patches that have changed (more efficient)
+        repeat=False)               # Only play the animation once
+
+    # Encode the segment under a temporary name and only rename it once it is complete
+    segment = 'segment_{:04d}.mp4'.format(len(manifest['segments']))
+    tmp_segment = os.path.join(out_dir, 'tmp_' + segment)
+    ani.save(tmp_segment, writer=FFMpegWriter(fps=fps), dpi=fig.dpi)
+    os.replace(tmp_segment, os.path.join(out_dir, segment))
+
+    # Record the completed segment
+    manifest['frame'] = end
+    manifest['segments'].append(segment)
+    write_manifest(manifest)
+
+# Make sure none of the recorded segments have gone missing before concatenating them
+for segment in manifest['segments']:
+    if not os.path.exists(os.path.join(out_dir, segment)):
+        raise FileNotFoundError("Segment {} listed in {} is missing. Remove the directory to start "
+                "a new export.".format(segment, manifest_file))
+
+# Concatenate the segments without re-encoding them
+list_file = os.path.join(out_dir, 'segments.txt')
+with open(list_file, 'w') as f:
+    for segment in manifest['segments']:
+        f.write("file '{}'\n".format(segment))
+subprocess.run([rcParams['animation.ffmpeg_path'], '-y',
+        '-f', 'concat',
+        '-safe', '0',
+        '-i', list_file,
+        '-c', 'copy',
+        out_file],
+    check=True)
+
+# Clean up the list file and any segments left over from an interrupted encode
+os.remove(list_file)
+for tmp_segment in glob.glob(os.path.join(out_dir, 'tmp_segment_*.mp4')):
+    os.remove(tmp_segment)